@@ -30,6 +30,13 @@ error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Run a step with live output, stall detection and a log in /tmp/omarchy-install-logs
+run_step() {
+    local name="$1"
+    shift
+    python3 "$DOTFILES_DIR/scripts/step_runner.py" --name "$name" -- "$@"
+}
+
 step() {
     echo -e "${MAGENTA}[STEP]${NC} $1"
 }
@@ -235,7 +242,7 @@ else
 
     # Update system first
     info "Updating system..."
-    sudo pacman -Syu --noconfirm
+    run_step "System update" sudo pacman -Syu --noconfirm
 
     # Read packages from selection file
     INSTALLED=0
@@ -252,7 +259,7 @@ else
         else
             echo -e "${BLUE}[INSTALL]${NC} $package..."
             # Capture exit code without stopping script
-            if yay -S --noconfirm "$package" 2>&1; then
+            if run_step "Install $package" yay -S --noconfirm "$package"; then
                 echo -e "${GREEN}[✓]${NC} $package"
                 ((INSTALLED++))
             else
@@ -276,7 +283,7 @@ else
             else
                 echo -e "${BLUE}[INSTALL]${NC} $package..."
                 # Capture exit code without stopping script
-                if yay -S --noconfirm "$package" 2>&1; then
+                if run_step "Install $package" yay -S --noconfirm "$package"; then
                     echo -e "${GREEN}[✓]${NC} $package"
                     ((INSTALLED++))
                 else
@@ -295,6 +302,13 @@ else
     if [ $FAILED -gt 0 ]; then
         warn "Failed packages: ${FAILED_PACKAGES[*]}"
     fi
+
+    # Build the conda ai-dev environment once, or unpack a prebuilt pack
+    if [ "$AI_DEV_ENABLED" = "true" ] && [ -f "$DOTFILES_DIR/scripts/ai-env-pack.py" ]; then
+        echo ""
+        info "Setting up conda ai-dev environment..."
+        python3 "$DOTFILES_DIR/scripts/ai-env-pack.py" ensure || warn "AI environment setup failed (retry: scripts/ai-env-pack.py)"
+    fi
 fi
 echo ""
 
@@ -323,7 +337,7 @@ else
         for container in $SELECTED_CONTAINERS; do
             if docker compose ps --services 2>/dev/null | grep -q "^$container$"; then
                 echo -e "${BLUE}[PULL]${NC} $container..."
-                docker compose pull "$container" 2>/dev/null || warn "Could not pull $container"
+                run_step "Pull $container" docker compose pull "$container" || warn "Could not pull $container"
             fi
         done
 
@@ -331,7 +345,7 @@ else
         info "Starting containers..."
         for container in $SELECTED_CONTAINERS; do
             echo -e "${GREEN}[START]${NC} $container..."
-            docker compose up -d "$container" 2>/dev/null || warn "Could not start $container"
+            run_step "Start $container" docker compose up -d "$container" || warn "Could not start $container"
         done
 
         # Wait for startup
@@ -404,6 +418,17 @@ elif [ "$HARDWARE_PROFILE" = "t420s" ]; then
     sudo systemctl start thermald.service 2>/dev/null || true
 fi
 
+# Memory tuning (zram, sysctl, OOM policy) for this RAM/disk/container mix
+if [ -f "$DOTFILES_DIR/scripts/tune-memory.py" ]; then
+    info "Generating memory tuning..."
+    python3 "$DOTFILES_DIR/scripts/tune-memory.py"
+    read -p "Apply memory tuning? (Y/n) " -n 1 -r
+    echo
+    if [[ ! $REPLY =~ ^[Nn]$ ]]; then
+        python3 "$DOTFILES_DIR/scripts/tune-memory.py" --apply > /dev/null || warn "Memory tuning failed"
+    fi
+fi
+
 success "System services configured"
 echo ""
 
@@ -414,7 +439,7 @@ step "6/6 - Final System Update"
 echo ""
 
 info "Updating system..."
-sudo pacman -Syu --noconfirm
+run_step "Final system update" sudo pacman -Syu --noconfirm
 success "System updated"
 echo ""
 
@@ -4,13 +4,22 @@ Omarchy Dotfiles - Interactive TUI Installer
 Professional installation interface for Hyprland configs, packages, and Docker containers
 """
 
+import time
+
+# Startup clock, taken before anything else is imported
+STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
-import subprocess
-import json
+import threading
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional
 
+# Shared step runner (live output, stall detection, logs) lives in scripts/.
+# It pulls in subprocess/selectors, so it is imported by the background
+# hardware probe rather than here.
+sys.path.insert(0, str(Path(__file__).parent.resolve() / "scripts"))
+
 # Try to import dialog, fallback to basic interface if not available
 try:
     from dialog import Dialog
@@ -20,13 +29,202 @@ except ImportError:
     print("WARNING: python-dialog not installed. Install with: sudo pacman -S python-dialog")
     sys.exit(2)
 
+TIMING_FILE = Path("/tmp/installer-timing.txt")
+HARDWARE_ENV_FILE = Path("/tmp/hardware-profile.env")
+
+# Package categories
+CORE_PACKAGES = [
+    "act-bin", "git-lfs", "go", "nano", "neovim", "rust",
+    "buildah", "podman", "podman-compose", "crun", "fuse-overlayfs",
+    "slirp4netns", "skopeo", "nvidia-container-toolkit"
+]
+
+DEV_TOOLS = [
+    "zed", "claude-code", "lmstudio", "jenkins", "drone",
+    "awesome-omarchy-tui-bin", "mkcert", "nginx"
+]
+
+SYSTEM_PACKAGES = [
+    "linux-surface", "linux-surface-headers", "intel-ucode",
+    "efibootmgr", "fwupd", "iptsd", "sof-firmware"
+]
+
+OPTIONAL_TOOLS = [
+    "brave-bin", "jellyfin-media-player", "protonmail-bridge",
+    "tailscale", "nmap", "swaks", "librecad", "wttrbar"
+]
+
+# Container definitions
+CONTAINERS = {
+    "ollama": {
+        "name": "Ollama LLM Server",
+        "description": "Local LLM inference",
+        "size": "~4GB",
+        "gpu": "optional",
+        "port": "11434"
+    },
+    "open-webui": {
+        "name": "Open WebUI",
+        "description": "Web interface for Ollama",
+        "size": "~500MB",
+        "gpu": "no",
+        "port": "8080"
+    },
+    "mcp-docker-manager": {
+        "name": "MCP Docker Manager",
+        "description": "Docker container management MCP",
+        "size": "~100MB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "mcp-filesystem": {
+        "name": "MCP Filesystem",
+        "description": "File system access MCP",
+        "size": "~80MB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "mcp-obsidian": {
+        "name": "MCP Obsidian",
+        "description": "Obsidian vault integration",
+        "size": "~90MB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "mcp-rss-aggregator": {
+        "name": "MCP RSS Aggregator",
+        "description": "RSS feed aggregation",
+        "size": "~70MB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "mcp-markdown-converter": {
+        "name": "MCP Markdown Converter",
+        "description": "Markdown to PDF/HTML conversion",
+        "size": "~120MB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "mcp-pytorch-inspector": {
+        "name": "MCP PyTorch Inspector",
+        "description": "PyTorch model inspection",
+        "size": "~200MB",
+        "gpu": "yes",
+        "port": "none"
+    },
+    "mcp-gpu-optimizer": {
+        "name": "MCP GPU Optimizer",
+        "description": "GPU optimization tools",
+        "size": "~150MB",
+        "gpu": "required",
+        "port": "none"
+    },
+    "mcp-librecad": {
+        "name": "MCP LibreCAD",
+        "description": "CAD file management",
+        "size": "~300MB",
+        "gpu": "no",
+        "port": "5900"
+    },
+    "mcp-kali-tools": {
+        "name": "MCP Kali Tools",
+        "description": "Security testing tools",
+        "size": "~2GB",
+        "gpu": "no",
+        "port": "none"
+    },
+    "phoneinfoga": {
+        "name": "PhoneInfoga",
+        "description": "OSINT phone number tool",
+        "size": "~100MB",
+        "gpu": "no",
+        "port": "8081"
+    }
+}
+
+
+class StartupTimer:
+    """Startup milestones, in seconds since the process started"""
+
+    def __init__(self, t0: float = STARTUP_T0):
+        self.t0 = t0
+        self.marks: Dict[str, float] = {}
+        self.on_screen_time = 0.0
+        # Time spent on screens when each mark was taken
+        self.on_screen_at: Dict[str, float] = {}
+        self.blocked: Dict[str, float] = {}
+
+    def mark(self, name: str):
+        """Record a milestone (first occurrence wins)"""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+            self.on_screen_at[name] = self.on_screen_time
+
+    def screen(self, show, *args, **kwargs):
+        """Show a dialog screen, counting the time spent waiting on the user"""
+        started = time.perf_counter()
+        try:
+            return show(*args, **kwargs)
+        finally:
+            self.on_screen_time += time.perf_counter() - started
+
+    def block(self, name: str, seconds: float):
+        """Record time the user had to wait on background work"""
+        self.blocked[name] = self.blocked.get(name, 0.0) + seconds
+
+    def report(self) -> str:
+        lines = ["Installer startup timing (seconds since process start)"]
+        for name, seconds in sorted(self.marks.items(), key=lambda m: m[1]):
+            lines.append(f"  {name:<28}{seconds:8.3f}")
+        lines.append(f"  {'time on screens (user)':<28}{self.on_screen_time:8.3f}")
+        # Time to interaction as the installer's own cost, without reading time
+        for name, label in (("first_interactive", "interactive, excluding user"),
+                            ("interactive_checklist", "checklist, excluding user")):
+            if name in self.marks:
+                own = self.marks[name] - self.on_screen_at[name]
+                lines.append(f"  {label:<28}{own:8.3f}")
+        for name, seconds in self.blocked.items():
+            lines.append(f"  {'waited on ' + name:<28}{seconds:8.3f}")
+        return "\n".join(lines)
+
+    def save(self, path: Path = TIMING_FILE):
+        try:
+            path.write_text(self.report() + "\n")
+        except OSError:
+            pass
+
+
+class BackgroundTask(threading.Thread):
+    """Startup job that runs while the welcome screen is displayed"""
+
+    def __init__(self, name: str, target, timer: StartupTimer):
+        super().__init__(name=name, daemon=True)
+        self.target = target
+        self.timer = timer
+        self.result = None
+        self.error: Optional[Exception] = None
+
+    def run(self):
+        try:
+            self.result = self.target()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.timer.mark(f"{self.name}_ready")
+
+    def wait(self):
+        """Join the task and return its result, re-raising its error"""
+        self.join()
+        if self.error:
+            raise self.error
+        return self.result
+
 
 class OmarchyInstaller:
     """Main installer class with TUI interface"""
 
-    def __init__(self):
-        self.d = Dialog(dialog="dialog", autowidgetsize=True)
-        self.d.set_background_title("Omarchy Dotfiles Installer v2.0")
+    def __init__(self, timer: Optional[StartupTimer] = None):
+        self.timer = timer or StartupTimer()
 
         # Paths
         self.dotfiles_dir = Path(__file__).parent.resolve()
@@ -46,116 +244,19 @@ class OmarchyInstaller:
         self.selected_containers = []
         self.ai_dev_enabled = False
         self.installation_mode = "full"
+        self.containers = CONTAINERS
 
-        # Package categories
-        self.core_packages = [
-            "act-bin", "git-lfs", "go", "nano", "neovim", "rust",
-            "buildah", "podman", "podman-compose", "crun", "fuse-overlayfs",
-            "slirp4netns", "skopeo", "nvidia-container-toolkit"
-        ]
-
-        self.dev_tools = [
-            "zed", "claude-code", "lmstudio", "jenkins", "drone",
-            "awesome-omarchy-tui-bin", "mkcert", "nginx"
-        ]
-
-        self.system_packages = [
-            "linux-surface", "linux-surface-headers", "intel-ucode",
-            "efibootmgr", "fwupd", "iptsd", "sof-firmware"
-        ]
-
-        self.optional_tools = [
-            "brave-bin", "jellyfin-media-player", "protonmail-bridge",
-            "tailscale", "nmap", "swaks", "librecad", "wttrbar"
-        ]
+        # Probe hardware and load the package catalog while the welcome
+        # screen is up, instead of after it
+        self.probe_status = [0, "Detecting hardware..."]
+        self.hardware_task = BackgroundTask("hardware", self._probe_hardware, self.timer)
+        self.catalog_task = BackgroundTask("catalog", self._load_catalog, self.timer)
+        self.hardware_task.start()
+        self.catalog_task.start()
 
-        # Container definitions
-        self.containers = {
-            "ollama": {
-                "name": "Ollama LLM Server",
-                "description": "Local LLM inference",
-                "size": "~4GB",
-                "gpu": "optional",
-                "port": "11434"
-            },
-            "open-webui": {
-                "name": "Open WebUI",
-                "description": "Web interface for Ollama",
-                "size": "~500MB",
-                "gpu": "no",
-                "port": "8080"
-            },
-            "mcp-docker-manager": {
-                "name": "MCP Docker Manager",
-                "description": "Docker container management MCP",
-                "size": "~100MB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "mcp-filesystem": {
-                "name": "MCP Filesystem",
-                "description": "File system access MCP",
-                "size": "~80MB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "mcp-obsidian": {
-                "name": "MCP Obsidian",
-                "description": "Obsidian vault integration",
-                "size": "~90MB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "mcp-rss-aggregator": {
-                "name": "MCP RSS Aggregator",
-                "description": "RSS feed aggregation",
-                "size": "~70MB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "mcp-markdown-converter": {
-                "name": "MCP Markdown Converter",
-                "description": "Markdown to PDF/HTML conversion",
-                "size": "~120MB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "mcp-pytorch-inspector": {
-                "name": "MCP PyTorch Inspector",
-                "description": "PyTorch model inspection",
-                "size": "~200MB",
-                "gpu": "yes",
-                "port": "none"
-            },
-            "mcp-gpu-optimizer": {
-                "name": "MCP GPU Optimizer",
-                "description": "GPU optimization tools",
-                "size": "~150MB",
-                "gpu": "required",
-                "port": "none"
-            },
-            "mcp-librecad": {
-                "name": "MCP LibreCAD",
-                "description": "CAD file management",
-                "size": "~300MB",
-                "gpu": "no",
-                "port": "5900"
-            },
-            "mcp-kali-tools": {
-                "name": "MCP Kali Tools",
-                "description": "Security testing tools",
-                "size": "~2GB",
-                "gpu": "no",
-                "port": "none"
-            },
-            "phoneinfoga": {
-                "name": "PhoneInfoga",
-                "description": "OSINT phone number tool",
-                "size": "~100MB",
-                "gpu": "no",
-                "port": "8081"
-            }
-        }
+        self.d = Dialog(dialog="dialog", autowidgetsize=True)
+        self.d.set_background_title("Omarchy Dotfiles Installer v2.0")
+        self.timer.mark("installer_ready")
 
     def run(self):
         """Main execution flow"""
@@ -239,14 +340,62 @@ for your specific system.
 
 Press OK to continue...
 """
-        code = self.d.msgbox(banner, height=22, width=70, title="Welcome")
+        self.timer.mark("first_screen")
+        code = self.timer.screen(self.d.msgbox, banner, height=22, width=70, title="Welcome")
         return code == self.d.OK
 
-    def detect_hardware(self):
-        """Run hardware detection script"""
+    def _probe_hardware(self) -> Optional[Dict[str, str]]:
+        """Run the hardware detection script (background thread)"""
         detect_script = self.dotfiles_dir / "scripts" / "detect-hardware.sh"
-
         if not detect_script.exists():
+            return None
+
+        from step_runner import run_step, CallbackSink
+
+        def on_line(text, progress):
+            self.probe_status[:] = [self.probe_status[0] + 1, text]
+
+        def on_stall(seconds):
+            self.probe_status[1] = f"No output for {seconds:.0f}s, still detecting..."
+
+        result = run_step("Detect hardware", [str(detect_script)],
+                          sink=CallbackSink(on_line, on_stall), stall_seconds=30)
+        if not result.ok:
+            raise RuntimeError(result.failure_report(lines=6))
+
+        values = {}
+        if HARDWARE_ENV_FILE.exists():
+            with open(HARDWARE_ENV_FILE, 'r') as f:
+                for line in f:
+                    if '=' in line:
+                        key, value = line.strip().split('=', 1)
+                        values[key] = value
+        return values
+
+    def detect_hardware(self):
+        """Collect the background hardware probe, with a gauge if it is still running"""
+        if self.hardware_task.is_alive():
+            started = time.perf_counter()
+            # The probe streams into probe_status; mirror it into a gauge
+            self.d.gauge_start("Detecting hardware...", height=10, width=70,
+                               title="Hardware Detection")
+            try:
+                while self.hardware_task.is_alive():
+                    lines_seen, text = self.probe_status
+                    self.d.gauge_update(min(lines_seen * 3, 95), text=text, update_text=True)
+                    self.hardware_task.join(0.2)
+            finally:
+                self.d.gauge_stop()
+            self.timer.block("hardware", time.perf_counter() - started)
+
+        try:
+            values = self.hardware_task.wait()
+        except Exception as e:
+            self.d.msgbox(f"Hardware detection error: {str(e)}\nUsing generic profile.",
+                         height=16, width=76)
+            return
+
+        if values is None:
             self.d.msgbox(
                 "Warning: Hardware detection script not found.\n"
                 "Using generic profile.",
@@ -254,33 +403,12 @@ Press OK to continue...
             )
             return
 
-        # Show progress
-        self.d.infobox("Detecting hardware...\nPlease wait...", height=5, width=40)
-
-        try:
-            subprocess.run([str(detect_script)], check=True,
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-            # Load results
-            env_file = Path("/tmp/hardware-profile.env")
-            if env_file.exists():
-                with open(env_file, 'r') as f:
-                    for line in f:
-                        if '=' in line:
-                            key, value = line.strip().split('=', 1)
-                            if key == "HARDWARE_PROFILE":
-                                self.hardware_profile = value
-                            elif key == "HAS_NVIDIA":
-                                self.has_nvidia = value.lower() == "true"
-                            elif key == "HAS_INTEL_GPU":
-                                self.has_intel_gpu = value.lower() == "true"
-                            elif key == "RAM_GB":
-                                self.ram_gb = int(value) if value.isdigit() else 0
-                            elif key == "CPU_GENERATION":
-                                self.cpu_generation = value
-        except Exception as e:
-            self.d.msgbox(f"Hardware detection error: {str(e)}\nUsing generic profile.",
-                         height=8, width=60)
+        self.hardware_profile = values.get("HARDWARE_PROFILE", self.hardware_profile)
+        self.has_nvidia = values.get("HAS_NVIDIA", "").lower() == "true"
+        self.has_intel_gpu = values.get("HAS_INTEL_GPU", "").lower() == "true"
+        ram = values.get("RAM_GB", "")
+        self.ram_gb = int(ram) if ram.isdigit() else 0
+        self.cpu_generation = values.get("CPU_GENERATION", self.cpu_generation)
 
     def show_hardware_info(self):
         """Display detected hardware information"""
@@ -308,7 +436,8 @@ CPU Gen:       {self.cpu_generation if self.cpu_generation else 'Unknown'}
 Hardware-specific optimizations will be applied
 automatically during installation.
 """
-        self.d.msgbox(info, height=15, width=60, title="Hardware Detection")
+        self.timer.screen(self.d.msgbox, info, height=15, width=60,
+                          title="Hardware Detection")
 
     def select_installation_mode(self) -> Optional[str]:
         """Select installation mode"""
@@ -321,7 +450,10 @@ automatically during installation.
              "Guided installation with explanations")
         ]
 
-        code, tag = self.d.menu(
+        # First choice after hardware detection; every mode passes through here
+        self.timer.mark("first_interactive")
+        code, tag = self.timer.screen(
+            self.d.menu,
             "Choose installation mode:",
             height=15,
             width=70,
@@ -334,8 +466,8 @@ automatically during installation.
             return tag
         return None
 
-    def load_all_packages(self) -> List[str]:
-        """Load all packages from packages.txt"""
+    def _load_catalog(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Read packages.txt and sort it into categories (background thread)"""
         packages = []
 
         if self.packages_file.exists():
@@ -347,30 +479,44 @@ automatically during installation.
                         pkg = line.split()[0]
                         packages.append(pkg)
 
-        return packages
-
-    def select_packages(self) -> Optional[List[str]]:
-        """Interactive package selection with categories"""
-        all_packages = self.load_all_packages()
-
-        # Categorize packages
         categorized = {
             "Core Packages (Required)": [],
             "Development Tools": [],
             "System Packages": [],
             "Optional Tools": []
         }
+        core, dev, system = set(CORE_PACKAGES), set(DEV_TOOLS), set(SYSTEM_PACKAGES)
 
-        for pkg in all_packages:
-            if pkg in self.core_packages:
+        for pkg in packages:
+            if pkg in core:
                 categorized["Core Packages (Required)"].append(pkg)
-            elif pkg in self.dev_tools:
+            elif pkg in dev:
                 categorized["Development Tools"].append(pkg)
-            elif pkg in self.system_packages:
+            elif pkg in system:
                 categorized["System Packages"].append(pkg)
             else:
                 categorized["Optional Tools"].append(pkg)
 
+        return packages, categorized
+
+    def catalog(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Package catalog from the background loader, waiting if needed"""
+        if self.catalog_task.is_alive():
+            started = time.perf_counter()
+            self.d.infobox("Loading package catalog...", height=5, width=40)
+            self.catalog_task.join()
+            self.timer.block("catalog", time.perf_counter() - started)
+        return self.catalog_task.wait()
+
+    def load_all_packages(self) -> List[str]:
+        """Load all packages from packages.txt"""
+        packages, _ = self.catalog()
+        return list(packages)
+
+    def select_packages(self) -> Optional[List[str]]:
+        """Interactive package selection with categories"""
+        _, categorized = self.catalog()
+
         # Build checklist items
         choices = []
         for category, pkgs in categorized.items():
@@ -381,7 +527,9 @@ automatically during installation.
                     selected = category.startswith("Core")
                     choices.append((pkg, "", selected))
 
-        code, selections = self.d.checklist(
+        self.timer.mark("interactive_checklist")
+        code, selections = self.timer.screen(
+            self.d.checklist,
             "Select packages to install:\n"
             "(Core packages are pre-selected and recommended)\n\n"
             "Use SPACE to select/deselect, ENTER to confirm",
@@ -440,7 +588,9 @@ automatically during installation.
         if self.hardware_profile == "t420s" or not self.has_nvidia:
             warning = "\nNote: GPU-dependent containers are hidden/disabled\ndue to hardware limitations.\n"
 
-        code, selections = self.d.checklist(
+        self.timer.mark("interactive_checklist")
+        code, selections = self.timer.screen(
+            self.d.checklist,
             f"Select Docker containers to deploy:\n"
             f"{warning}\n"
             f"Use SPACE to select/deselect, ENTER to confirm",
@@ -483,7 +633,8 @@ Enable AI Development Bundle?
             message += "\nWarning: Your system has no NVIDIA GPU.\n"
             message += "CUDA packages will be skipped, but CPU ML tools will be installed.\n"
 
-        code = self.d.yesno(message, height=23, width=70, title="AI Development Bundle")
+        code = self.timer.screen(self.d.yesno, message, height=23, width=70,
+                                 title="AI Development Bundle")
         return code == self.d.OK
 
     def manual_mode(self) -> bool:
@@ -503,8 +654,8 @@ Enable AI Development Bundle?
         }
 
         for step_name, question in steps:
-            code = self.d.yesno(question, height=8, width=50,
-                               title=f"Step: {step_name}")
+            code = self.timer.screen(self.d.yesno, question, height=8, width=50,
+                                     title=f"Step: {step_name}")
             selections[step_name] = (code == self.d.OK)
 
         # Configure based on selections
@@ -647,9 +798,17 @@ def main():
         print("Install with: sudo pacman -S python-dialog")
         sys.exit(2)
 
+    timer = StartupTimer()
+    timer.mark("imports")
+
     # Create and run installer
-    installer = OmarchyInstaller()
+    installer = OmarchyInstaller(timer)
     exit_code = installer.run()
+
+    # Startup report: always saved, printed with OMARCHY_TUI_TIMING=1
+    timer.save()
+    if os.environ.get("OMARCHY_TUI_TIMING"):
+        print(timer.report(), file=sys.stderr)
     sys.exit(exit_code)
 
 
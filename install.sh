@@ -29,6 +29,13 @@ error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Run a step with live output, stall detection and a log in /tmp/omarchy-install-logs
+run_step() {
+    local name="$1"
+    shift
+    python3 "$DOTFILES_DIR/scripts/step_runner.py" --name "$name" -- "$@"
+}
+
 step() {
     echo -e "${MAGENTA}[STEP]${NC} $1"
 }
@@ -221,7 +228,7 @@ if [ -f "$DOTFILES_DIR/scripts/install-packages.sh" ]; then
     else
         # Update system first
         info "Updating system..."
-        sudo pacman -Syu --noconfirm
+        run_step "System update" sudo pacman -Syu --noconfirm
 
         # Install packages
         PACKAGE_NAMES=$(awk '{print $1}' "$PACKAGES_FILE")
@@ -244,7 +251,7 @@ if [ -f "$DOTFILES_DIR/scripts/install-packages.sh" ]; then
                 ((SKIPPED++))
             else
                 echo -e "${BLUE}[INSTALL]${NC} $package..."
-                if yay -S --noconfirm "$package" 2>/dev/null; then
+                if run_step "Install $package" yay -S --noconfirm "$package"; then
                     echo -e "${GREEN}[✓]${NC} $package"
                     ((INSTALLED++))
                 else
@@ -262,6 +269,13 @@ if [ -f "$DOTFILES_DIR/scripts/install-packages.sh" ]; then
         if [ $FAILED -gt 0 ]; then
             warn "Failed packages: ${FAILED_PACKAGES[*]}"
         fi
+
+        # Build the conda ai-dev environment once, or unpack a prebuilt pack
+        if [ "$AI_DEV_ENABLED" = "true" ] && [ -f "$DOTFILES_DIR/scripts/ai-env-pack.py" ]; then
+            echo ""
+            info "Setting up conda ai-dev environment..."
+            python3 "$DOTFILES_DIR/scripts/ai-env-pack.py" ensure || warn "AI environment setup failed (retry: scripts/ai-env-pack.py)"
+        fi
     fi
 else
     warn "Package installer not found, skipping..."
@@ -293,15 +307,21 @@ else
 
         # Pull images
         info "Pulling Docker images..."
-        docker compose $COMPOSE_FILES pull ollama open-webui phoneinfoga 2>/dev/null || warn "Some images couldn't be pulled"
+        run_step "Pull images" docker compose $COMPOSE_FILES pull ollama open-webui phoneinfoga || warn "Some images couldn't be pulled"
 
         # Start services
         info "Starting containers..."
+        COMPOSE_PROFILE=""
         if [ "$HARDWARE_PROFILE" = "surface" ] && [ "$HAS_NVIDIA" = true ]; then
-            docker compose $COMPOSE_FILES --profile nvidia-gpu up -d
-        else
-            docker compose $COMPOSE_FILES up -d
+            COMPOSE_PROFILE="--profile nvidia-gpu"
         fi
+        run_step "Start containers" docker compose $COMPOSE_FILES $COMPOSE_PROFILE up -d
+
+        # Record the started containers for memory tuning. `docker ps` may not
+        # work yet, because the docker group only applies to new logins.
+        STARTED_CONTAINERS="/tmp/omarchy-started-containers.txt"
+        docker compose $COMPOSE_FILES $COMPOSE_PROFILE config --services > "$STARTED_CONTAINERS" 2>/dev/null \
+            || rm -f "$STARTED_CONTAINERS"
 
         # Wait for startup
         sleep 5
@@ -375,6 +395,21 @@ elif [ "$HARDWARE_PROFILE" = "t420s" ]; then
     sudo systemctl start thermald.service 2>/dev/null || warn "thermald failed to start"
 fi
 
+# Memory tuning (zram, sysctl, OOM policy) for this RAM/disk/container mix
+if [ -f "$DOTFILES_DIR/scripts/tune-memory.py" ]; then
+    TUNE_ARGS=()
+    if [ -n "$STARTED_CONTAINERS" ] && [ -f "$STARTED_CONTAINERS" ]; then
+        TUNE_ARGS=(--containers-file "$STARTED_CONTAINERS")
+    fi
+    info "Generating memory tuning..."
+    python3 "$DOTFILES_DIR/scripts/tune-memory.py" "${TUNE_ARGS[@]}"
+    read -p "Apply memory tuning? (Y/n) " -n 1 -r
+    echo
+    if [[ ! $REPLY =~ ^[Nn]$ ]]; then
+        python3 "$DOTFILES_DIR/scripts/tune-memory.py" "${TUNE_ARGS[@]}" --apply > /dev/null || warn "Memory tuning failed"
+    fi
+fi
+
 success "System services configured"
 echo ""
 
@@ -388,7 +423,7 @@ read -p "Update Omarchy system packages? (Y/n) " -n 1 -r
 echo
 if [[ ! $REPLY =~ ^[Nn]$ ]]; then
     info "Updating system..."
-    sudo pacman -Syu --noconfirm
+    run_step "Final system update" sudo pacman -Syu --noconfirm
     success "System updated"
 else
     info "Skipping system update"
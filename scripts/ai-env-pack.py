@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+AI Environment Pack Script
+Builds the conda ai-dev environment once into a relocatable, content-hashed
+pack (lockfile + compressed tarball) and unpacks it on other machines
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from step_runner import run_step
+
+# Colors
+GREEN = '\033[0;32m'
+YELLOW = '\033[1;33m'
+RED = '\033[0;31m'
+NC = '\033[0m'
+
+def info(msg):
+    print(f"{GREEN}[INFO]{NC} {msg}")
+
+def warn(msg):
+    print(f"{YELLOW}[WARN]{NC} {msg}")
+
+def error(msg):
+    print(f"{RED}[ERROR]{NC} {msg}", file=sys.stderr)
+
+DOTFILES_DIR = Path(__file__).resolve().parent.parent
+AI_PACKAGES_FILE = DOTFILES_DIR / "packages-ai-dev.txt"
+HARDWARE_ENV = Path("/tmp/hardware-profile.env")
+DETECT_SCRIPT = DOTFILES_DIR / "scripts" / "detect-hardware.sh"
+
+DEFAULT_STORE = Path(os.environ.get(
+    "OMARCHY_PACK_STORE", Path.home() / ".cache" / "omarchy" / "ai-env-packs"))
+DEFAULT_PREFIX = Path.home() / ".conda" / "envs" / "ai-dev"
+
+# Bump when the pack layout or fixup logic changes so old packs are rebuilt
+PACK_FORMAT = 1
+PYTHON_VERSION = "3.12"
+CONDA_CHANNEL = "conda-forge"
+
+# Packages that only make sense with a CUDA-capable NVIDIA GPU
+CUDA_PACKAGES = {
+    "cuda", "cuda-tools", "cudnn", "nccl", "python-cupy", "python-pycuda"
+}
+
+# packages-ai-dev.txt name -> conda package name. Anything not listed here
+# (miniconda3, cuda toolkit, virtualenv) stays a system package only.
+CONDA_PACKAGES = {
+    "jupyter-notebook": "notebook",
+    "openblas": "openblas",
+    "python-cupy": "cupy",
+    "python-matplotlib": "matplotlib",
+    "python-numpy": "numpy",
+    "python-pandas": "pandas",
+    "python-plotly": "plotly",
+    "python-pycuda": "pycuda",
+    "python-scikit-learn": "scikit-learn",
+    "python-scipy": "scipy",
+    "python-seaborn": "seaborn",
+    "python-toml": "toml",
+}
+
+# The build happens under a deliberately long prefix so that every baked-in
+# path can be rewritten in place (NUL-padded) when unpacking to a shorter one
+BUILD_PREFIX_LENGTH = 200
+MARKER_FILE = ".omarchy-pack.json"
+CHUNK_SIZE = 1024 * 1024
+
+
+def upstream_version(version: str) -> str:
+    """Strip the pacman epoch and pkgrel: '2:1.25.3-1' -> '1.25.3'"""
+    version = version.split(":", 1)[-1]
+    return version.rsplit("-", 1)[0]
+
+
+def load_pins(packages_file: Path) -> Dict[str, str]:
+    """Load 'name version' pins from a package list"""
+    pins = {}
+    with open(packages_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split()
+            pins[fields[0]] = fields[1] if len(fields) > 1 else ""
+    return pins
+
+
+def load_hardware_profile(env_file: Path = HARDWARE_ENV) -> Dict[str, str]:
+    """Read the KEY=value file written by detect-hardware.sh, running it if missing"""
+    # /tmp is cleared on reboot, so a standalone run usually has no profile yet
+    if not env_file.exists() and DETECT_SCRIPT.exists():
+        info("No hardware profile yet, detecting hardware...")
+        run_step("Detect hardware", [str(DETECT_SCRIPT)], stall_seconds=30)
+    profile = {}
+    if env_file.exists():
+        with open(env_file, 'r') as f:
+            for line in f:
+                if '=' in line:
+                    key, value = line.strip().split('=', 1)
+                    profile[key] = value
+    return profile
+
+
+def detect_variant(profile: Dict[str, str]) -> Optional[str]:
+    """Pick the pack variant for this machine: 'cuda', 'cpu', or None if unknown"""
+    if "HAS_NVIDIA" not in profile:
+        return None
+    if profile["HAS_NVIDIA"].lower() != "true":
+        return "cpu"
+    # Legacy GPUs (the T420s NVS 4200M) cannot run CUDA 13
+    if profile.get("NVIDIA_DRIVER") == "nvidia-390xx-dkms":
+        return "cpu"
+    return "cuda"
+
+
+def build_lock(pins: Dict[str, str], variant: str) -> Dict:
+    """Build the lock describing the environment for a variant"""
+    specs = []
+    for pkg, version in sorted(pins.items()):
+        if variant == "cpu" and pkg in CUDA_PACKAGES:
+            continue
+        conda_name = CONDA_PACKAGES.get(pkg)
+        if conda_name is None:
+            continue
+        if version:
+            specs.append(f"{conda_name}={upstream_version(version)}")
+        else:
+            specs.append(conda_name)
+
+    lock = {
+        "format": PACK_FORMAT,
+        "variant": variant,
+        "channel": CONDA_CHANNEL,
+        "python": PYTHON_VERSION,
+        "specs": specs,
+    }
+    canonical = json.dumps(lock, sort_keys=True, separators=(',', ':'))
+    lock["hash"] = hashlib.sha256(canonical.encode()).hexdigest()
+    return lock
+
+
+def pack_paths(store: Path, lock: Dict) -> Dict[str, Path]:
+    """Locations of the tarball and lockfile for a lock in the store"""
+    stem = f"ai-dev-{lock['variant']}-{lock['hash'][:16]}"
+    return {
+        "tarball": store / f"{stem}.tar.gz",
+        "lock": store / f"{stem}.lock.json",
+    }
+
+
+def find_conda() -> Optional[str]:
+    """Locate the conda binary (PATH, then the usual miniconda3 prefixes)"""
+    conda = shutil.which("conda")
+    if conda:
+        return conda
+    for candidate in (Path("/opt/miniconda3/bin/conda"),
+                      Path.home() / "miniconda3" / "bin" / "conda"):
+        if candidate.exists():
+            return str(candidate)
+    return None
+
+
+def build_prefix(store: Path, lock: Dict) -> Path:
+    """Long, unique staging prefix for building a pack"""
+    base = store / "build" / f"{lock['variant']}-{lock['hash'][:16]}-"
+    padding = max(BUILD_PREFIX_LENGTH - len(str(base)), 1)
+    return Path(str(base) + "_" * padding)
+
+
+def scan_prefix_references(prefix: Path) -> List[Dict[str, str]]:
+    """Find every file that embeds the build prefix and how to rewrite it"""
+    needle = str(prefix).encode()
+    references = []
+    for root, _dirs, files in os.walk(prefix):
+        for name in files:
+            path = Path(root) / name
+            if path.is_symlink():
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            if needle not in data:
+                continue
+            references.append({
+                "path": str(path.relative_to(prefix)),
+                "mode": "binary" if b"\x00" in data else "text",
+            })
+    return references
+
+
+def build_env(conda: str, prefix: Path, lock: Dict):
+    """Solve and install the locked specs into a fresh prefix"""
+    if prefix.exists():
+        shutil.rmtree(prefix)
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+
+    cmd = [conda, "create", "--yes", "--quiet", "--prefix", str(prefix),
+           "--override-channels", "--channel", lock["channel"],
+           f"python={lock['python']}"] + lock["specs"]
+    info(f"Solving and installing {len(lock['specs'])} packages "
+         f"({lock['variant']} variant)...")
+    result = run_step(f"conda create ({lock['variant']})", cmd)
+    if not result.ok:
+        raise RuntimeError(result.failure_report())
+
+    # Record what the solver actually picked so the pack is reproducible
+    explicit = subprocess.run(
+        [conda, "list", "--explicit", "--md5", "--prefix", str(prefix)],
+        check=True, capture_output=True, text=True
+    )
+    lock["explicit"] = [l for l in explicit.stdout.splitlines()
+                        if l and not l.startswith('#')]
+
+
+def create_pack(store: Path, lock: Dict, conda: str) -> Dict[str, Path]:
+    """Build the environment once and store it as a relocatable pack"""
+    paths = pack_paths(store, lock)
+    prefix = build_prefix(store, lock)
+    store.mkdir(parents=True, exist_ok=True)
+
+    started = time.monotonic()
+    build_env(conda, prefix, lock)
+
+    info("Scanning for embedded paths...")
+    lock["build_prefix"] = str(prefix)
+    lock["references"] = scan_prefix_references(prefix)
+
+    info(f"Compressing pack to {paths['tarball'].name}...")
+    # Unique temp names: two machines may build the same hash into a shared store
+    fd, tmp_tarball = tempfile.mkstemp(prefix=paths["tarball"].name + ".",
+                                       suffix=".partial", dir=store)
+    try:
+        sha = hashlib.sha256()
+        with open(fd, 'wb') as raw:
+            writer = _HashingWriter(raw, sha)
+            with tarfile.open(fileobj=writer, mode="w|gz") as tar:
+                tar.add(str(prefix), arcname=".")
+        lock["sha256"] = sha.hexdigest()
+        lock["built_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        os.replace(tmp_tarball, paths["tarball"])
+    except BaseException:
+        Path(tmp_tarball).unlink(missing_ok=True)
+        raise
+
+    # The lockfile is written last, and atomically: a pack only counts once it exists
+    fd, tmp_lock = tempfile.mkstemp(prefix=paths["lock"].name + ".",
+                                    suffix=".partial", dir=store)
+    with open(fd, 'w') as f:
+        json.dump(lock, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_lock, paths["lock"])
+
+    shutil.rmtree(prefix)
+    info(f"✓ Pack built in {time.monotonic() - started:.0f}s")
+    return paths
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it"""
+
+    def __init__(self, fileobj, digest):
+        self.fileobj = fileobj
+        self.digest = digest
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.fileobj.write(data)
+
+
+class _HashingReader:
+    """File wrapper that hashes everything read through it"""
+
+    def __init__(self, fileobj, digest):
+        self.fileobj = fileobj
+        self.digest = digest
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.digest.update(data)
+        return data
+
+
+def fixup_prefix(root: Path, old_prefix: str, new_prefix: Path,
+                 references: List[Dict[str, str]]):
+    """Rewrite the build prefix embedded in the files under root"""
+    old = old_prefix.encode()
+    new = str(new_prefix).encode()
+    if len(new) > len(old):
+        raise RuntimeError(
+            f"Target prefix is longer than the build prefix ({len(old)} chars)")
+
+    for ref in references:
+        path = root / ref["path"]
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if ref["mode"] == "text":
+            data = data.replace(old, new)
+        else:
+            # Binaries must keep their layout: shorten each C string in place
+            data = _replace_padded(data, old, new)
+
+        with open(path, 'r+b') as f:
+            f.write(data)
+            f.truncate()
+
+
+def _replace_padded(data: bytes, old: bytes, new: bytes) -> bytes:
+    """Replace old with new inside NUL-terminated strings, keeping offsets"""
+    out = bytearray(data)
+    start = out.find(old)
+    while start != -1:
+        end = out.find(b"\x00", start)
+        if end == -1:
+            end = len(out)
+        replacement = new + bytes(out[start + len(old):end])
+        out[start:end] = replacement + b"\x00" * (end - start - len(replacement))
+        start = out.find(old, start + len(new))
+    return bytes(out)
+
+
+def is_foreign_prefix(prefix: Path) -> bool:
+    """True if prefix exists but was not unpacked from a pack (a user's own env)"""
+    return prefix.exists() and not (prefix / MARKER_FILE).exists()
+
+
+def unpack(paths: Dict[str, Path], prefix: Path, force: bool = False) -> Dict:
+    """Stream-decompress a pack next to prefix, fix up paths, swap it in"""
+    if is_foreign_prefix(prefix) and not force:
+        raise RuntimeError(f"{prefix} exists and was not created from a pack "
+                           "(rerun with --force to move it to a backup)")
+
+    with open(paths["lock"], 'r') as f:
+        lock = json.load(f)
+
+    started = time.monotonic()
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".ai-dev-unpack-", dir=prefix.parent))
+
+    try:
+        info(f"Unpacking {paths['tarball'].name}...")
+        sha = hashlib.sha256()
+        with open(paths["tarball"], 'rb') as raw:
+            reader = _HashingReader(raw, sha)
+            # Stream mode: decompress and extract in one forward pass
+            with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+                if hasattr(tarfile, "tar_filter"):
+                    tar.extractall(staging, filter="tar")
+                else:
+                    tar.extractall(staging)
+            # Drain trailing padding so the digest covers the whole file
+            while reader.read(CHUNK_SIZE):
+                pass
+
+        if sha.hexdigest() != lock["sha256"]:
+            raise RuntimeError(f"Checksum mismatch for {paths['tarball'].name}")
+
+        info(f"Fixing up paths in {len(lock['references'])} files...")
+        fixup_prefix(staging, lock["build_prefix"], prefix, lock["references"])
+
+        with open(staging / MARKER_FILE, 'w') as f:
+            json.dump({"hash": lock["hash"], "variant": lock["variant"]}, f)
+
+        if is_foreign_prefix(prefix):
+            backup = prefix.with_name(f"{prefix.name}.backup-{time.strftime('%Y%m%d-%H%M%S')}")
+            warn(f"Moving existing {prefix} to {backup}")
+            os.rename(prefix, backup)
+        elif prefix.exists():
+            shutil.rmtree(prefix)
+        os.rename(staging, prefix)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    info(f"✓ Environment ready at {prefix} ({time.monotonic() - started:.0f}s)")
+    return lock
+
+
+def installed_hash(prefix: Path) -> Optional[str]:
+    """Lock hash of the pack currently unpacked at prefix, if any"""
+    marker = prefix / MARKER_FILE
+    if not marker.exists():
+        return None
+    try:
+        with open(marker, 'r') as f:
+            return json.load(f).get("hash")
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or unpack the relocatable ai-dev conda environment")
+    parser.add_argument("command", nargs="?", default="ensure",
+                        choices=["ensure", "build", "status", "lock"],
+                        help="ensure (default): unpack a matching pack, "
+                             "building it first if the lock changed")
+    parser.add_argument("--variant", choices=["cuda", "cpu"],
+                        help="Override the variant detected from the hardware profile")
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE,
+                        help=f"Pack directory, can be shared (default: {DEFAULT_STORE})")
+    parser.add_argument("--prefix", type=Path, default=DEFAULT_PREFIX,
+                        help=f"Environment location (default: {DEFAULT_PREFIX})")
+    parser.add_argument("--packages", type=Path, default=AI_PACKAGES_FILE,
+                        help="Pinned package list")
+    parser.add_argument("--force", action="store_true",
+                        help="Replace an existing environment that was not created from a "
+                             "pack (it is moved to a backup, not deleted)")
+    args = parser.parse_args()
+
+    if not args.packages.exists():
+        error(f"Package list not found at {args.packages}")
+        sys.exit(1)
+
+    variant = args.variant or detect_variant(load_hardware_profile())
+    if variant is None:
+        # Guessing "cpu" would put the CPU pack on a CUDA machine
+        error(f"Could not detect the GPU ({HARDWARE_ENV} missing or incomplete)")
+        error("Rerun with --variant cuda or --variant cpu")
+        sys.exit(1)
+    lock = build_lock(load_pins(args.packages), variant)
+    paths = pack_paths(args.store, lock)
+    have_pack = paths["lock"].exists() and paths["tarball"].exists()
+
+    if args.command == "lock":
+        print(json.dumps(lock, indent=2, sort_keys=True))
+        return
+
+    if args.command == "status":
+        print(f"Variant:   {variant}")
+        print(f"Lock hash: {lock['hash']}")
+        print(f"Pack:      {paths['tarball'] if have_pack else 'not built'}")
+        current = installed_hash(args.prefix) == lock["hash"]
+        print(f"Installed: {'up to date' if current else 'no'} ({args.prefix})")
+        return
+
+    print("=" * 40)
+    print("  AI Environment Pack")
+    print("=" * 40)
+    print()
+    info(f"Variant: {variant} (lock {lock['hash'][:16]})")
+
+    if args.command == "ensure" and installed_hash(args.prefix) == lock["hash"]:
+        info(f"✓ {args.prefix} already matches the lock, nothing to do")
+        return
+
+    # Check before a long build, not after it
+    if args.command == "ensure" and is_foreign_prefix(args.prefix) and not args.force:
+        error(f"{args.prefix} exists and was not created from a pack, leaving it alone")
+        error("Rerun with --force to move it to a backup and unpack the pack")
+        sys.exit(1)
+
+    try:
+        if args.command == "build" or not have_pack:
+            conda = find_conda()
+            if conda is None:
+                error("conda not found - install miniconda3 first")
+                sys.exit(1)
+            if not have_pack:
+                warn("No pack for this lock yet, building from scratch")
+            create_pack(args.store, lock, conda)
+            if args.command == "build":
+                return
+
+        unpack(paths, args.prefix, force=args.force)
+    except (OSError, ValueError, RuntimeError, subprocess.CalledProcessError,
+            tarfile.TarError) as e:
+        error(f"AI environment pack failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
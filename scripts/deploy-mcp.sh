@@ -28,6 +28,13 @@ error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Run a step with live output, stall detection and a log in /tmp/omarchy-install-logs
+run_step() {
+    local name="$1"
+    shift
+    python3 "$DOTFILES_DIR/scripts/step_runner.py" --name "$name" -- "$@"
+}
+
 # Parse arguments
 USE_SELECTION=false
 INTERACTIVE=false
@@ -189,17 +196,17 @@ info "Deploying MCP containers..."
 
 # Pull public images
 info "Pulling public images..."
-docker compose $COMPOSE_FILES pull ollama open-webui phoneinfoga 2>/dev/null || warn "Some images couldn't be pulled"
+run_step "Pull public images" docker compose $COMPOSE_FILES pull ollama open-webui phoneinfoga || warn "Some images couldn't be pulled"
 
 # Start services
 info "Starting services..."
 
 if [ "$HARDWARE_PROFILE" = "surface" ] && [ "$HAS_NVIDIA" = true ]; then
     info "Starting with NVIDIA GPU support..."
-    docker compose $COMPOSE_FILES --profile nvidia-gpu up -d
+    run_step "Start containers" docker compose $COMPOSE_FILES --profile nvidia-gpu up -d
 else
     info "Starting without GPU-specific containers..."
-    docker compose $COMPOSE_FILES up -d
+    run_step "Start containers" docker compose $COMPOSE_FILES up -d
 fi
 
 # Wait for services to be healthy
@@ -12,6 +12,7 @@ SELECTION_FILE="$DOTFILES_DIR/package-selection.txt"
 # Parse arguments
 USE_SELECTION=false
 INTERACTIVE=false
+REAPPLY=false
 
 for arg in "$@"; do
     case $arg in
@@ -21,6 +22,9 @@ for arg in "$@"; do
         --interactive|-i)
             INTERACTIVE=true
             ;;
+        --reapply)
+            REAPPLY=true
+            ;;
     esac
 done
 
@@ -43,6 +47,13 @@ error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Run a step with live output, stall detection and a log in /tmp/omarchy-install-logs
+run_step() {
+    local name="$1"
+    shift
+    python3 "$DOTFILES_DIR/scripts/step_runner.py" --name "$name" -- "$@"
+}
+
 echo "======================================"
 echo "  Package Installation"
 echo "======================================"
@@ -73,7 +84,7 @@ if [ "$USE_SELECTION" = true ] && [ -f "$SELECTION_FILE" ]; then
     info "Using custom package selection"
     PACKAGES_FILE="$SELECTION_FILE"
 # Check if selection file exists (from previous run)
-elif [ ! "$USE_SELECTION" = true ] && [ -f "$SELECTION_FILE" ]; then
+elif [ ! "$USE_SELECTION" = true ] && [ "$REAPPLY" = false ] && [ -f "$SELECTION_FILE" ]; then
     warn "Found existing package selection file"
     read -p "Use previous package selection? (y/N) " -n 1 -r
     echo
@@ -83,7 +94,7 @@ elif [ ! "$USE_SELECTION" = true ] && [ -f "$SELECTION_FILE" ]; then
 fi
 
 # Ask about interactive selection if not already set
-if [ "$PACKAGES_FILE" = "$DOTFILES_DIR/packages.txt" ] && [ "$USE_SELECTION" = false ]; then
+if [ "$PACKAGES_FILE" = "$DOTFILES_DIR/packages.txt" ] && [ "$USE_SELECTION" = false ] && [ "$REAPPLY" = false ]; then
     echo ""
     echo "Package installation options:"
     echo "  1. Install all packages (default) - 219 packages"
@@ -143,6 +154,16 @@ if [ "$AI_DEV_ENABLED" = "true" ]; then
 fi
 echo ""
 
+# Re-apply mode: treat pinned versions as a lock and only fix what drifted
+if [ "$REAPPLY" = true ]; then
+    REAPPLY_EXIT=0
+    python3 "$DOTFILES_DIR/scripts/reapply-packages.py" --lock "$PACKAGES_FILE" || REAPPLY_EXIT=$?
+    if [ -n "$AI_DEV_TEMP_FILE" ] && [ -f "$AI_DEV_TEMP_FILE" ]; then
+        rm "$AI_DEV_TEMP_FILE"
+    fi
+    exit $REAPPLY_EXIT
+fi
+
 # Show hardware-specific warnings
 if [ "$HARDWARE_PROFILE" = "t420s" ] && [ "$HAS_NVIDIA" = true ]; then
     warn "T420s with NVIDIA GPU detected"
@@ -169,7 +190,7 @@ fi
 
 # Update system first
 info "Updating system..."
-sudo pacman -Syu --noconfirm
+run_step "System update" sudo pacman -Syu --noconfirm
 
 # Extract just package names (remove versions)
 PACKAGE_NAMES=$(awk '{print $1}' "$PACKAGES_FILE")
@@ -193,7 +214,7 @@ while IFS= read -r package; do
         ((SKIPPED++))
     else
         echo -e "${BLUE}[INSTALL]${NC} $package..."
-        if yay -S --noconfirm "$package" 2>/dev/null; then
+        if run_step "Install $package" yay -S --noconfirm "$package"; then
             echo -e "${GREEN}[✓]${NC} $package installed successfully"
             ((INSTALLED++))
         else
@@ -227,6 +248,13 @@ fi
 echo "======================================"
 echo ""
 
+# Build the conda ai-dev environment once, or unpack a prebuilt pack
+if [ "$AI_DEV_ENABLED" = "true" ] && [ -f "$DOTFILES_DIR/scripts/ai-env-pack.py" ]; then
+    info "Setting up conda ai-dev environment..."
+    python3 "$DOTFILES_DIR/scripts/ai-env-pack.py" ensure || warn "AI environment setup failed (retry: scripts/ai-env-pack.py)"
+    echo ""
+fi
+
 # Hardware-specific post-install notes
 if [ "$HARDWARE_PROFILE" = "surface" ]; then
     info "Surface-specific notes:"
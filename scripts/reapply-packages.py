@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Package Re-apply Script
+Treats the pinned versions in packages.txt (and packages-ai-dev.txt) as a
+lock and only touches packages that drifted from it, instead of a full
+pacman -Syu plus a check of every package
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from step_runner import run_step
+
+# Colors
+GREEN = '\033[0;32m'
+YELLOW = '\033[1;33m'
+RED = '\033[0;31m'
+BLUE = '\033[0;34m'
+NC = '\033[0m'
+
+def info(msg):
+    print(f"{GREEN}[INFO]{NC} {msg}")
+
+def warn(msg):
+    print(f"{YELLOW}[WARN]{NC} {msg}")
+
+def error(msg):
+    print(f"{RED}[ERROR]{NC} {msg}", file=sys.stderr)
+
+DOTFILES_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_LOCK = DOTFILES_DIR / "packages.txt"
+PACKAGE_CACHE = Path("/var/cache/pacman/pkg")
+YAY_CACHE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "yay"
+ARCHIVE_URL = "https://archive.archlinux.org/packages"
+STATE_FILE = Path(os.environ.get("XDG_STATE_HOME", Path.home() / ".local" / "state")) \
+    / "omarchy" / "package-lock.sha256"
+
+
+def load_lock(lock_files: List[Path]) -> Tuple[Dict[str, str], str]:
+    """Pinned versions from all lock files, plus a hash of their content"""
+    pins = {}
+    digest = hashlib.sha256()
+    for lock_file in lock_files:
+        data = lock_file.read_bytes()
+        digest.update(data)
+        for line in data.decode().splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split()
+            pins[fields[0]] = fields[1] if len(fields) > 1 else ""
+    return pins, digest.hexdigest()
+
+
+def installed_versions() -> Dict[str, str]:
+    """Every locally installed package and version, in a single pacman call"""
+    result = subprocess.run(["pacman", "-Q"], capture_output=True, text=True, check=True)
+    versions = {}
+    for line in result.stdout.splitlines():
+        name, version = line.split()
+        versions[name] = version
+    return versions
+
+
+def repo_packages() -> set:
+    """Names in the local sync databases (official repos), in a single pacman call"""
+    result = subprocess.run(["pacman", "-Sl"], capture_output=True, text=True, check=True)
+    return {fields[1] for fields in map(str.split, result.stdout.splitlines())
+            if len(fields) >= 3}
+
+
+def repo_architectures(names: List[str]) -> Dict[str, str]:
+    """Architecture (x86_64/any) of repo packages, in a single pacman call"""
+    if not names:
+        return {}
+    result = subprocess.run(["pacman", "-Si"] + names, capture_output=True, text=True,
+                            env=dict(os.environ, LC_ALL="C"))
+    arches = {}
+    name = None
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(":")
+        key = key.strip()
+        if key == "Name":
+            name = value.strip()
+        elif key == "Architecture" and name:
+            arches.setdefault(name, value.strip())
+    return arches
+
+
+def archive_url(name: str, version: str, arch: str) -> str:
+    """Exact package file on the Arch Linux Archive"""
+    return f"{ARCHIVE_URL}/{name[0]}/{name}/{name}-{version}-{arch}.pkg.tar.zst"
+
+
+def vercmp(a: str, b: str) -> int:
+    """pacman's version ordering: <0 if a is older than b"""
+    result = subprocess.run(["vercmp", a, b], capture_output=True, text=True, check=True)
+    return int(result.stdout.strip())
+
+
+def classify(pins: Dict[str, str], local: Dict[str, str]) -> Dict[str, List[Tuple[str, str, str]]]:
+    """Sort pinned packages into missing / upgrade / downgrade / current"""
+    drift = {"missing": [], "upgrade": [], "downgrade": [], "current": []}
+    for name, pinned in sorted(pins.items()):
+        have = local.get(name)
+        if have is None:
+            drift["missing"].append((name, "", pinned))
+        elif not pinned or have == pinned:
+            drift["current"].append((name, have, pinned))
+        elif vercmp(have, pinned) < 0:
+            drift["upgrade"].append((name, have, pinned))
+        else:
+            drift["downgrade"].append((name, have, pinned))
+    return drift
+
+
+def cached_package(name: str, version: str) -> Optional[Path]:
+    """Package file for an exact version in the pacman or yay build cache, if any"""
+    # yay keeps AUR builds in ~/.cache/yay/<pkg>/, not in the pacman cache
+    for cache in (PACKAGE_CACHE, YAY_CACHE / name):
+        for arch in ("x86_64", "any"):
+            for path in sorted(cache.glob(f"{name}-{version}-{arch}.pkg.tar.*")):
+                if not path.name.endswith(".sig"):
+                    return path
+    return None
+
+
+def plan_delta(drifted: List[Tuple[str, str, str]], repos: set,
+               have_yay: bool) -> Dict[str, list]:
+    """Decide where each drifted package comes from, without a database sync"""
+    plan = {"cache": [], "archive": [], "repo": [], "aur": [], "unavailable": []}
+    official = [name for name, _, pinned in drifted if name in repos and pinned]
+    arches = repo_architectures(official)
+    for name, have, pinned in drifted:
+        path = cached_package(name, pinned) if pinned else None
+        if path:
+            plan["cache"].append(str(path))
+        elif name in repos:
+            if not pinned:
+                # Nothing to pin to: whatever the current databases have
+                plan["repo"].append(name)
+            elif name in arches:
+                plan["archive"].append(archive_url(name, pinned, arches[name]))
+            else:
+                plan["unavailable"].append((name, pinned, "architecture unknown"))
+        elif not have_yay:
+            plan["unavailable"].append((name, pinned, "AUR package and yay is not installed"))
+        elif not have or vercmp(have, pinned) < 0:
+            # The AUR only has the current PKGBUILD; the re-check flags an overshoot
+            plan["aur"].append(name)
+        else:
+            plan["unavailable"].append((name, pinned, "not in the yay build cache"))
+    return plan
+
+
+def read_state() -> str:
+    try:
+        return STATE_FILE.read_text().strip()
+    except OSError:
+        return ""
+
+
+def write_state(lock_hash: str):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(lock_hash + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bring installed packages in line with the pinned versions")
+    parser.add_argument("--lock", type=Path, action="append",
+                        help=f"Pinned package list, can be repeated (default: {DEFAULT_LOCK})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Show what drifted without changing anything")
+    args = parser.parse_args()
+
+    lock_files = args.lock or [DEFAULT_LOCK]
+    for lock_file in lock_files:
+        if not lock_file.exists():
+            error(f"Package list not found at {lock_file}")
+            sys.exit(1)
+
+    print("=" * 40)
+    print("  Package Re-apply")
+    print("=" * 40)
+    print()
+
+    started = time.monotonic()
+    pins, lock_hash = load_lock(lock_files)
+    lock_changed = lock_hash != read_state()
+    local = installed_versions()
+    drift = classify(pins, local)
+    check_time = time.monotonic() - started
+
+    for kind, label in (("missing", "MISSING"), ("upgrade", "UPGRADE"), ("downgrade", "DOWNGRADE")):
+        for name, have, pinned in drift[kind]:
+            arrow = f"{have} -> {pinned}" if have else pinned
+            print(f"{BLUE}[{label}]{NC} {name} {arrow}")
+
+    drifted = drift["missing"] + drift["upgrade"] + drift["downgrade"]
+    info(f"Checked {len(pins)} pinned packages in {check_time * 1000:.0f} ms: "
+         f"{len(drift['current'])} current, {len(drifted)} drifted")
+    info(f"Lock {'changed' if lock_changed else 'unchanged'} since last re-apply")
+
+    if not drifted:
+        if not args.dry_run:
+            write_state(lock_hash)
+        info("✓ Nothing to do, skipping sync")
+        return
+
+    # Exact files (local caches, then the Arch Linux Archive) need no
+    # database sync, so there is no partial upgrade and nothing past the pins
+    plan = plan_delta(drifted, repo_packages(), shutil.which("yay") is not None)
+
+    if plan["cache"]:
+        info(f"{len(plan['cache'])} package(s) available in the local package caches")
+    if plan["archive"]:
+        info(f"{len(plan['archive'])} package(s) from the Arch Linux Archive")
+    if plan["repo"]:
+        info(f"{len(plan['repo'])} unpinned package(s) from the repositories: "
+             f"{' '.join(plan['repo'])}")
+    if plan["aur"]:
+        info(f"{len(plan['aur'])} package(s) built from the AUR: {' '.join(plan['aur'])}")
+    for name, pinned, reason in plan["unavailable"]:
+        warn(f"{name} {pinned} cannot be installed from here ({reason})")
+
+    if args.dry_run:
+        for url in plan["archive"]:
+            print(f"  {url}")
+        info("Dry run - no changes made")
+        return
+
+    failed = False
+    steps = [
+        ("Re-apply cached packages", ["sudo", "pacman", "-U"], plan["cache"]),
+        ("Re-apply from the archive", ["sudo", "pacman", "-U"], plan["archive"]),
+        ("Install from repositories", ["sudo", "pacman", "-S"], plan["repo"]),
+        ("Build from the AUR", ["yay", "-S"], plan["aur"]),
+    ]
+    for name, cmd, targets in steps:
+        if targets:
+            result = run_step(name, cmd + ["--noconfirm", "--needed"] + targets)
+            failed |= not result.ok
+
+    # Verify against the lock again, still one pacman call
+    remaining = classify(pins, installed_versions())
+    still_drifted = remaining["missing"] + remaining["upgrade"] + remaining["downgrade"]
+    elapsed = time.monotonic() - started
+
+    print()
+    print("=" * 40)
+    print("  Re-apply Summary")
+    print("=" * 40)
+    info(f"Fixed: {len(drifted) - len(still_drifted)} of {len(drifted)} drifted packages")
+    for name, have, pinned in still_drifted:
+        warn(f"{name}: installed {have or 'nothing'}, lock wants {pinned}")
+    info(f"Delta applied in {elapsed:.1f}s")
+
+    if failed or still_drifted:
+        if still_drifted:
+            warn("Pins that are neither cached nor in the Arch Linux Archive need "
+                 "the package file (installed with pacman -U) or an updated lock")
+        sys.exit(1)
+
+    write_state(lock_hash)
+    info("✓ Installed packages match the lock")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Step Runner
+Runs an installer step and streams its output live instead of hiding it.
+
+Output is read without blocking and shown in a dialog gauge/programbox or
+printed for headless runs. The last lines are kept in a bounded ring buffer
+for failure reports, and the full log is written to disk by a background
+thread. A step with no output and no progress for --stall seconds is
+reported as stalled, so a slow step no longer looks like a hung one.
+
+Usage from bash:
+  python3 scripts/step_runner.py --name "Install zed" -- yay -S --noconfirm zed
+
+Usage from Python:
+  from step_runner import run_step
+  result = run_step("Detect hardware", ["scripts/detect-hardware.sh"])
+"""
+
+import argparse
+import codecs
+import os
+import queue
+import re
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Colors
+YELLOW = '\033[1;33m'
+RED = '\033[0;31m'
+DIM = '\033[2m'
+NC = '\033[0m'
+
+LOG_DIR = Path(os.environ.get("OMARCHY_LOG_DIR", "/tmp/omarchy-install-logs"))
+RING_SIZE = 200
+STALL_SECONDS = 120
+# How long to keep reading after the step exits, for output still in flight
+DRAIN_SECONDS = 0.5
+PROGRESS_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)%')
+
+
+class StepResult:
+    """Outcome of a step: exit code, timing, stall info and the output tail"""
+
+    def __init__(self, name: str, returncode: int, duration: float,
+                 stalls: int, tail: List[str], log_path: Path):
+        self.name = name
+        self.returncode = returncode
+        self.duration = duration
+        self.stalls = stalls
+        self.tail = tail
+        self.log_path = log_path
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def failure_report(self, lines: int = 30) -> str:
+        """Human-readable report built from the ring buffer"""
+        report = [f"Step '{self.name}' failed (exit {self.returncode}) "
+                  f"after {self.duration:.0f}s"]
+        if self.stalls:
+            report.append(f"Stalled {self.stalls} time(s)")
+        report.append(f"Last {min(lines, len(self.tail))} lines:")
+        report.extend("  " + l for l in self.tail[-lines:])
+        report.append(f"Full log: {self.log_path}")
+        return "\n".join(report)
+
+
+class _LogWriter(threading.Thread):
+    """Writes log lines to disk off the read loop"""
+
+    def __init__(self, path: Path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.lines = queue.Queue()
+
+    def run(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            while True:
+                line = self.lines.get()
+                if line is None:
+                    break
+                f.write(line + "\n")
+                # Flush whenever we catch up so the log is useful mid-step
+                if self.lines.empty():
+                    f.flush()
+
+    def write(self, line: str):
+        self.lines.put(line)
+
+    def close(self):
+        self.lines.put(None)
+        self.join()
+
+
+class HeadlessSink:
+    """Prints output lines and stall warnings to the terminal"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def start(self):
+        pass
+
+    def line(self, text: str, progress: Optional[float]):
+        print(f"{DIM}  │ {text}{NC}", flush=True)
+
+    def stall(self, seconds: float):
+        print(f"{YELLOW}[STALL]{NC} {self.name}: no output for {seconds:.0f}s "
+              "(still running)", flush=True)
+
+    def finish(self, result: StepResult):
+        pass
+
+
+class DialogSink:
+    """Feeds a `dialog --gauge` or `dialog --programbox` subprocess"""
+
+    def __init__(self, name: str, mode: str = "gauge"):
+        self.name = name
+        self.mode = mode
+        self.proc = None
+        self.percent = 0
+
+    def start(self):
+        if self.mode == "gauge":
+            cmd = ["dialog", "--title", self.name, "--gauge", "Starting...", "10", "76", "0"]
+        else:
+            cmd = ["dialog", "--title", self.name, "--programbox", "22", "90"]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, text=True)
+
+    def _send(self, data: str):
+        try:
+            self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def line(self, text: str, progress: Optional[float]):
+        if self.mode == "gauge":
+            if progress is not None:
+                self.percent = int(progress)
+            self._send(f"XXX\n{self.percent}\n{text[:70]}\nXXX\n")
+        else:
+            self._send(text + "\n")
+
+    def stall(self, seconds: float):
+        self.line(f"[no output for {seconds:.0f}s - still running]", None)
+
+    def finish(self, result: StepResult):
+        if self.proc:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            self.proc.wait()
+
+
+class CallbackSink:
+    """Adapts plain callables (e.g. python-dialog gauge_update) to a sink"""
+
+    def __init__(self, on_line: Callable[[str, Optional[float]], None],
+                 on_stall: Optional[Callable[[float], None]] = None):
+        self.on_line = on_line
+        self.on_stall = on_stall
+
+    def start(self):
+        pass
+
+    def line(self, text: str, progress: Optional[float]):
+        self.on_line(text, progress)
+
+    def stall(self, seconds: float):
+        if self.on_stall:
+            self.on_stall(seconds)
+
+    def finish(self, result: StepResult):
+        pass
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or "step"
+
+
+def run_step(name: str, cmd: List[str], sink=None, stall_seconds: float = STALL_SECONDS,
+             ring_size: int = RING_SIZE, log_dir: Path = LOG_DIR,
+             env: Optional[dict] = None, cwd: Optional[str] = None) -> StepResult:
+    """Run cmd, streaming merged stdout/stderr to sink line by line"""
+    sink = sink or HeadlessSink(name)
+    log_path = log_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{_slug(name)}.log"
+    writer = _LogWriter(log_path)
+    writer.start()
+    writer.write(f"$ {' '.join(cmd)}")
+
+    ring = deque(maxlen=ring_size)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    started = time.monotonic()
+    last_activity = started
+    last_progress = None
+    stalls = 0
+    stall_reported = False
+    pending = ""
+
+    def emit(text: str):
+        nonlocal last_progress, last_activity, stall_reported
+        text = text.rstrip()
+        if not text:
+            return
+        matches = PROGRESS_RE.findall(text)
+        progress = min(float(matches[-1]), 100.0) if matches else None
+        if progress is not None:
+            last_progress = progress
+        last_activity = time.monotonic()
+        stall_reported = False
+        ring.append(text)
+        writer.write(text)
+        sink.line(text, progress)
+
+    sink.start()
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                env=env, cwd=cwd)
+    except OSError as e:
+        writer.write(f"failed to start: {e}")
+        writer.close()
+        result = StepResult(name, 127, 0.0, 0, [str(e)], log_path)
+        sink.finish(result)
+        return result
+
+    fd = proc.stdout.fileno()
+    os.set_blocking(fd, False)
+    selector = selectors.DefaultSelector()
+    selector.register(fd, selectors.EVENT_READ)
+
+    exited_at = None
+    try:
+        while True:
+            events = selector.select(timeout=0.1 if exited_at else 0.25)
+            if events:
+                try:
+                    chunk = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    break
+                # Progress bars redraw with \r; treat it as a line break
+                pending += decoder.decode(chunk).replace("\r\n", "\n").replace("\r", "\n")
+                *lines, pending = pending.split("\n")
+                for text in lines:
+                    emit(text)
+            if exited_at is None:
+                if proc.poll() is not None:
+                    exited_at = time.monotonic()
+            elif not events or time.monotonic() - exited_at >= DRAIN_SECONDS:
+                # A grandchild (gpg-agent, a backgrounded helper) can keep the
+                # pipe open long after the step itself exited; stop at exit
+                break
+            idle = time.monotonic() - last_activity
+            if stall_seconds and idle >= stall_seconds and not stall_reported:
+                stalls += 1
+                stall_reported = True
+                writer.write(f"[stall] no output or progress for {idle:.0f}s "
+                             f"(last progress: {last_progress if last_progress is not None else 'none'})")
+                sink.stall(idle)
+        emit(pending + decoder.decode(b"", final=True))
+        returncode = proc.wait()
+    except KeyboardInterrupt:
+        proc.send_signal(signal.SIGINT)
+        returncode = proc.wait()
+        raise
+    finally:
+        selector.close()
+        proc.stdout.close()
+        writer.write(f"[exit {proc.poll()}] after {time.monotonic() - started:.1f}s")
+        writer.close()
+
+    result = StepResult(name, returncode, time.monotonic() - started, stalls,
+                        list(ring), log_path)
+    sink.finish(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run an installer step with live output and a bounded log tail")
+    parser.add_argument("--name", required=True, help="Step name shown in output and logs")
+    parser.add_argument("--ui", choices=["headless", "gauge", "programbox"], default="headless",
+                        help="Where to stream output (default: headless)")
+    parser.add_argument("--stall", type=float, default=STALL_SECONDS,
+                        help=f"Seconds without output/progress before a stall is reported "
+                             f"(default: {STALL_SECONDS}, 0 disables)")
+    parser.add_argument("--ring", type=int, default=RING_SIZE,
+                        help=f"Lines kept in memory for the failure report (default: {RING_SIZE})")
+    parser.add_argument("--log-dir", type=Path, default=LOG_DIR,
+                        help=f"Directory for full step logs (default: {LOG_DIR})")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Headless: only print output if the step fails")
+    parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run (after --)")
+    args = parser.parse_args()
+
+    cmd = args.cmd[1:] if args.cmd and args.cmd[0] == "--" else args.cmd
+    if not cmd:
+        parser.error("no command given")
+
+    if args.ui == "headless":
+        sink = HeadlessSink(args.name)
+        if args.quiet:
+            sink.line = lambda text, progress: None
+    else:
+        sink = DialogSink(args.name, args.ui)
+
+    result = run_step(args.name, cmd, sink=sink, stall_seconds=args.stall,
+                      ring_size=args.ring, log_dir=args.log_dir)
+
+    if not result.ok:
+        print(f"{RED}[FAIL]{NC} {result.failure_report()}", file=sys.stderr)
+    elif result.stalls:
+        print(f"{YELLOW}[WARN]{NC} {args.name} stalled {result.stalls} time(s) "
+              f"but finished in {result.duration:.0f}s")
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Memory Tuning Script
+Generates zram-generator, sysctl and OOM policy config from detected RAM,
+disk type and the selected containers, with a before/after headroom report
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Colors
+GREEN = '\033[0;32m'
+YELLOW = '\033[1;33m'
+RED = '\033[0;31m'
+NC = '\033[0m'
+
+def info(msg):
+    print(f"{GREEN}[INFO]{NC} {msg}")
+
+def warn(msg):
+    print(f"{YELLOW}[WARN]{NC} {msg}")
+
+def error(msg):
+    print(f"{RED}[ERROR]{NC} {msg}", file=sys.stderr)
+
+CONTAINER_SELECTION = Path("/tmp/container-selection.txt")
+STAGING_DIR = Path("/tmp/memory-tuning")
+
+# Rough resident memory per container in MB, used for the headroom report
+# and to decide how much the OOM policy should protect the desktop
+CONTAINER_MEMORY_MB = {
+    "ollama": 4096,
+    "open-webui": 600,
+    "mcp-docker-manager": 100,
+    "mcp-filesystem": 80,
+    "mcp-obsidian": 90,
+    "mcp-rss-aggregator": 70,
+    "mcp-markdown-converter": 150,
+    "mcp-pytorch-inspector": 400,
+    "mcp-gpu-optimizer": 200,
+    "mcp-librecad": 300,
+    "mcp-kali-tools": 512,
+    "phoneinfoga": 100,
+}
+
+# Hyprland, Waybar, a terminal and a browser with a few tabs
+DESKTOP_BASELINE_MB = 2560
+
+# zstd typically compresses anonymous memory around 3:1
+ZRAM_COMPRESSION_RATIO = 3.0
+
+# Processes the OOM killer should take first and never take
+OOM_PREFER = ["ollama", "ollama_llama_server", "jupyter-lab", "jupyter-notebook"]
+OOM_AVOID = ["Hyprland", "waybar", "sddm", "systemd", "dockerd", "containerd",
+             "pipewire", "wireplumber"]
+
+GENERATED_MARKER = "# Generated by omarchy-dotfiles scripts/tune-memory.py"
+BACKUP_SUFFIX = ".omarchy-backup"
+
+# Slice the compose file puts every container in (cgroup_parent)
+CONTAINER_SLICE = "omarchy-containers.slice"
+
+# Files earlier versions installed that are no longer generated
+OBSOLETE_FILES = ["/etc/systemd/system/docker.service.d/99-omarchy-oomd.conf",
+                  "/etc/systemd/system/system.slice.d/99-omarchy-oomd.conf"]
+
+SYSCTL_KEYS = [
+    "vm.swappiness", "vm.page-cluster", "vm.dirty_background_bytes",
+    "vm.dirty_bytes", "vm.dirty_writeback_centisecs",
+]
+
+
+def read_meminfo(root: Path) -> Dict[str, int]:
+    """Parse /proc/meminfo into kB values"""
+    values = {}
+    with open(root / "proc" / "meminfo", 'r') as f:
+        for line in f:
+            key, rest = line.split(':', 1)
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def read_swaps(root: Path) -> Dict[str, int]:
+    """Active swap in MB, split into zram and disk-backed devices"""
+    swaps = {"zram": 0, "disk": 0}
+    try:
+        with open(root / "proc" / "swaps", 'r') as f:
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                kind = "zram" if "/zram" in fields[0] else "disk"
+                swaps[kind] += int(fields[2]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return swaps
+
+
+def read_sysctl(root: Path, key: str) -> Optional[str]:
+    path = root / "proc" / "sys" / key.replace('.', '/')
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def root_block_device(root: Path) -> Optional[str]:
+    """Name of the whole-disk block device backing /"""
+    source = None
+    try:
+        with open(root / "proc" / "self" / "mountinfo", 'r') as f:
+            for line in f:
+                fields = line.split()
+                if fields[4] == "/":
+                    # Fields after the " - " separator: fstype, source, options
+                    source = fields[fields.index("-") + 2]
+                    break
+    except (OSError, ValueError, IndexError):
+        return None
+
+    if not source or not source.startswith("/dev/"):
+        return None
+
+    dev = os.path.basename(os.path.realpath(root / source.lstrip('/')))
+    class_dir = root / "sys" / "class" / "block" / dev
+    # Walk from a partition or device-mapper volume down to the disk
+    for _ in range(4):
+        if (class_dir / "partition").exists():
+            class_dir = Path(os.path.realpath(class_dir)).parent
+            continue
+        slaves = sorted((class_dir / "slaves").glob("*")) if (class_dir / "slaves").is_dir() else []
+        if slaves:
+            class_dir = root / "sys" / "class" / "block" / slaves[0].name
+            continue
+        break
+    return class_dir.name
+
+
+def is_rotational(root: Path) -> bool:
+    """True if the root disk (or, failing that, any real disk) spins"""
+    disk = root_block_device(root)
+    candidates = [disk] if disk else [
+        p.name for p in (root / "sys" / "block").glob("*")
+        if not p.name.startswith(("loop", "zram", "ram", "dm-"))
+    ]
+    for name in candidates:
+        try:
+            if (root / "sys" / "block" / name / "queue" / "rotational").read_text().strip() == "1":
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def load_containers(selection_file: Path) -> List[str]:
+    """Selected containers from the TUI, or whatever is running now"""
+    if selection_file.exists():
+        with open(selection_file, 'r') as f:
+            return [l.strip() for l in f if l.strip()]
+    if shutil.which("docker"):
+        result = subprocess.run(["docker", "ps", "--format", "{{.Names}}"],
+                                capture_output=True, text=True)
+        if result.returncode == 0:
+            return [l for l in result.stdout.split() if l in CONTAINER_MEMORY_MB]
+    return []
+
+
+def plan_tuning(ram_mb: int, rotational: bool, containers: List[str]) -> Dict:
+    """Decide zram size, sysctls and OOM thresholds"""
+    workload_mb = DESKTOP_BASELINE_MB + sum(CONTAINER_MEMORY_MB.get(c, 256) for c in containers)
+
+    # Small machines get zram equal to RAM; large ones need much less
+    if ram_mb <= 8 * 1024:
+        zram_mb = ram_mb
+    elif ram_mb <= 16 * 1024:
+        zram_mb = ram_mb // 2
+    else:
+        zram_mb = min(ram_mb // 4, 8 * 1024)
+    # Make sure the selected workload fits once compressed swap is counted
+    shortfall = workload_mb - ram_mb
+    if shortfall > 0:
+        needed = int(shortfall * ZRAM_COMPRESSION_RATIO / (ZRAM_COMPRESSION_RATIO - 1))
+        zram_mb = max(zram_mb, min(needed, ram_mb * 3 // 2))
+
+    # Writeback: keep bursts short on spinning disks so the desktop stays responsive
+    ram_bytes = ram_mb * 1024 * 1024
+    if rotational:
+        dirty_background = min(ram_bytes // 50, 64 * 1024 * 1024)
+        writeback = 500
+    else:
+        dirty_background = min(ram_bytes // 20, 256 * 1024 * 1024)
+        writeback = 1500
+    dirty = dirty_background * 4
+
+    tight = workload_mb > ram_mb * 0.75
+    return {
+        "ram_mb": ram_mb,
+        "rotational": rotational,
+        "containers": containers,
+        "workload_mb": workload_mb,
+        "zram_mb": zram_mb,
+        "sysctl": {
+            # zram swap is far cheaper than reclaiming page cache from disk
+            "vm.swappiness": 180,
+            # zram has no seek cost, so read-ahead on swap-in only wastes RAM
+            "vm.page-cluster": 0,
+            "vm.dirty_background_bytes": dirty_background,
+            "vm.dirty_bytes": dirty,
+            "vm.dirty_writeback_centisecs": writeback,
+        },
+        # Act earlier when the selected workload barely fits
+        "oom_mem_percent": 10 if tight else 5,
+        "oom_swap_percent": 15 if tight else 10,
+        "oomd_pressure_limit": "40%" if tight else "60%",
+    }
+
+
+def _generated(path: Path) -> bool:
+    """True if path was written by this script"""
+    try:
+        with open(path, 'r') as f:
+            return f.readline().startswith(GENERATED_MARKER)
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def render_files(plan: Dict, oom_backend: str) -> Dict[str, str]:
+    """Config file contents keyed by their absolute install path"""
+    header = (f"{GENERATED_MARKER}\n"
+              f"# RAM: {plan['ram_mb']} MB, disk: "
+              f"{'rotational' if plan['rotational'] else 'SSD/NVMe'}, "
+              f"containers: {', '.join(plan['containers']) or 'none'}\n\n")
+
+    files = {
+        "/etc/systemd/zram-generator.conf": header + (
+            "[zram0]\n"
+            f"zram-size = {plan['zram_mb']}\n"
+            "compression-algorithm = zstd\n"
+            "swap-priority = 100\n"
+            "fs-type = swap\n"
+        ),
+        "/etc/sysctl.d/99-omarchy-memory.conf": header + "".join(
+            f"{key} = {value}\n" for key, value in plan["sysctl"].items()
+        ),
+    }
+
+    if oom_backend == "earlyoom":
+        prefer = "|".join(OOM_PREFER)
+        avoid = "|".join(OOM_AVOID)
+        files["/etc/default/earlyoom"] = header + (
+            f"EARLYOOM_ARGS=\"-m {plan['oom_mem_percent']} -s {plan['oom_swap_percent']} "
+            f"-r 3600 --prefer '(^|/)({prefer})$' --avoid '(^|/)({avoid})$'\"\n"
+        )
+    else:
+        files["/etc/systemd/oomd.conf.d/99-omarchy.conf"] = header + (
+            "[OOM]\n"
+            f"SwapUsedLimit={100 - plan['oom_swap_percent']}%\n"
+            "DefaultMemoryPressureDurationSec=20s\n"
+        )
+        files["/etc/systemd/system/user@.service.d/99-omarchy-oomd.conf"] = header + (
+            "[Service]\n"
+            "ManagedOOMMemoryPressure=kill\n"
+            f"ManagedOOMMemoryPressureLimit={plan['oomd_pressure_limit']}\n"
+        )
+        # Containers run in their own slice (cgroup_parent in docker-compose.yml),
+        # so only their scopes are kill candidates. SwapUsedLimit above only
+        # applies to units with ManagedOOMSwap=kill, which is this one.
+        files[f"/etc/systemd/system/{CONTAINER_SLICE}"] = header + (
+            "[Unit]\n"
+            "Description=Omarchy Docker containers\n"
+            "Before=slices.target\n"
+            "\n"
+            "[Slice]\n"
+            "ManagedOOMSwap=kill\n"
+            "ManagedOOMMemoryPressure=kill\n"
+            f"ManagedOOMMemoryPressureLimit={plan['oomd_pressure_limit']}\n"
+        )
+    return files
+
+
+def headroom_report(plan: Dict, swaps: Dict[str, int], current: Dict[str, Optional[str]]):
+    """Print estimated memory headroom before and after tuning"""
+    ram_mb = plan["ram_mb"]
+    saving = 1 - 1 / ZRAM_COMPRESSION_RATIO
+    # zram only adds what compression saves; disk swap stays in place
+    swap_before = swaps["disk"] + int(swaps["zram"] * saving)
+    swap_after = swaps["disk"] + int(plan["zram_mb"] * saving)
+    workload = plan["workload_mb"]
+
+    before = ram_mb + swap_before - workload
+    after = ram_mb + swap_after - workload
+
+    def fmt(mb):
+        return f"{mb / 1024:+.1f} GB" if mb < 0 else f"{mb / 1024:.1f} GB"
+
+    print()
+    print("=" * 52)
+    print("  Memory Headroom (estimated)")
+    print("=" * 52)
+    print(f"{'':28}{'Before':>12}{'After':>12}")
+    print(f"{'Physical RAM':28}{fmt(ram_mb):>12}{fmt(ram_mb):>12}")
+    print(f"{'Swap (effective)':28}{fmt(swap_before):>12}{fmt(swap_after):>12}")
+    print(f"{'Desktop + containers':28}{fmt(workload):>12}{fmt(workload):>12}")
+    print(f"{'Headroom':28}{fmt(before):>12}{fmt(after):>12}")
+    print()
+    print(f"{'sysctl':28}{'Before':>12}{'After':>12}")
+    for key in SYSCTL_KEYS:
+        print(f"{key:28}{current.get(key) or '-':>12}{plan['sysctl'][key]:>12}")
+    print("=" * 52)
+    print()
+
+    if after < 0:
+        warn(f"Selected containers still exceed memory by {-after / 1024:.1f} GB")
+        warn("Consider skipping ollama or running smaller models")
+
+
+def apply_files(files: Dict[str, str], staging: Path, oom_backend: str):
+    """Install staged files and reload the affected services"""
+    for dest in files:
+        src = staging / dest.lstrip('/')
+        backup = Path(dest + BACKUP_SUFFIX)
+        # Keep the pre-tuning file once; later runs only replace our own output
+        if Path(dest).exists() and not backup.exists() and not _generated(Path(dest)):
+            subprocess.run(["sudo", "cp", "-a", dest, str(backup)], check=True)
+            info(f"Backed up {dest} to {backup}")
+        subprocess.run(["sudo", "install", "-Dm644", str(src), dest], check=True)
+        info(f"✓ {dest}")
+
+    for stale in OBSOLETE_FILES:
+        if Path(stale).exists():
+            subprocess.run(["sudo", "rm", "-f", stale], check=True)
+            info(f"Removed {stale}")
+
+    subprocess.run(["sudo", "sysctl", "--system", "--quiet"], check=True)
+    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
+    subprocess.run(["sudo", "systemctl", "restart", "systemd-zram-setup@zram0.service"], check=False)
+    if oom_backend == "earlyoom":
+        subprocess.run(["sudo", "systemctl", "enable", "--now", "earlyoom.service"], check=False)
+    else:
+        subprocess.run(["sudo", "systemctl", "enable", "--now", "systemd-oomd.service"], check=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate memory tuning for this machine")
+    parser.add_argument("--apply", action="store_true",
+                        help="Install the generated files (uses sudo)")
+    parser.add_argument("--oom", choices=["auto", "oomd", "earlyoom"], default="auto",
+                        help="OOM policy backend (auto: earlyoom if installed, else systemd-oomd)")
+    parser.add_argument("--containers-file", type=Path, default=CONTAINER_SELECTION,
+                        help="Selected containers, one per line")
+    parser.add_argument("--output", type=Path, default=STAGING_DIR,
+                        help=f"Where generated files are staged (default: {STAGING_DIR})")
+    parser.add_argument("--root", type=Path, default=Path("/"),
+                        help="Root of the /proc and /sys tree to inspect (for testing)")
+    args = parser.parse_args()
+
+    print("=" * 40)
+    print("  Memory Tuning")
+    print("=" * 40)
+    print()
+
+    meminfo = read_meminfo(args.root)
+    ram_mb = meminfo["MemTotal"] // 1024
+    rotational = is_rotational(args.root)
+    containers = load_containers(args.containers_file)
+
+    oom_backend = args.oom
+    if oom_backend == "auto":
+        oom_backend = "earlyoom" if shutil.which("earlyoom") else "oomd"
+
+    info(f"RAM: {ram_mb} MB")
+    info(f"Root disk: {'rotational' if rotational else 'SSD/NVMe'}")
+    info(f"Containers: {', '.join(containers) or 'none'}")
+    info(f"OOM policy: {'earlyoom' if oom_backend == 'earlyoom' else 'systemd-oomd'}")
+
+    plan = plan_tuning(ram_mb, rotational, containers)
+    files = render_files(plan, oom_backend)
+
+    for dest, content in files.items():
+        staged = args.output / dest.lstrip('/')
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        staged.write_text(content)
+    info(f"Generated {len(files)} files in {args.output}")
+
+    current = {key: read_sysctl(args.root, key) for key in SYSCTL_KEYS}
+    headroom_report(plan, read_swaps(args.root), current)
+
+    if not args.apply:
+        info("Dry run - re-run with --apply to install")
+        return
+
+    try:
+        apply_files(files, args.output, oom_backend)
+    except subprocess.CalledProcessError as e:
+        error(f"Applying memory tuning failed: {e}")
+        sys.exit(1)
+    info("✓ Memory tuning applied")
+
+if __name__ == "__main__":
+    main()
@@ -95,6 +95,14 @@ else
     fail "Python syntax errors found"
 fi
 
+for script in "$DOTFILES_DIR"/scripts/*.py; do
+    if python3 -m py_compile "$script" 2>/dev/null; then
+        pass "$(basename "$script") syntax is valid"
+    else
+        fail "Python syntax errors in $(basename "$script")"
+    fi
+done
+
 # Test 7: Bash syntax check
 echo "Test 7: Bash syntax validation"
 if bash -n "$DOTFILES_DIR/install-interactive.sh" 2>/dev/null; then
@@ -147,6 +155,46 @@ else
     warn "Hardware detection script not executable"
 fi
 
+# Test 9b: Governor against a fake sysfs tree
+echo "Test 9b: Power/effects governor"
+GOVERNOR="$DOTFILES_DIR/scripts/local-bin/omarchy-governor"
+if [ -f "$GOVERNOR" ]; then
+    FAKE_ROOT=$(mktemp -d)
+    mkdir -p "$FAKE_ROOT/proc" "$FAKE_ROOT/sys/class/power_supply/BAT0" \
+             "$FAKE_ROOT/sys/class/thermal/thermal_zone0"
+    echo "cpu  100 0 100 800 0 0 0 0 0 0" > "$FAKE_ROOT/proc/stat"
+    echo "0.50 0.40 0.30 1/100 1234" > "$FAKE_ROOT/proc/loadavg"
+    echo "Battery" > "$FAKE_ROOT/sys/class/power_supply/BAT0/type"
+    echo "10" > "$FAKE_ROOT/sys/class/power_supply/BAT0/capacity"
+    echo "Discharging" > "$FAKE_ROOT/sys/class/power_supply/BAT0/status"
+    echo "50000" > "$FAKE_ROOT/sys/class/thermal/thermal_zone0/temp"
+
+    GOVERNOR_LOG=$(python3 "$GOVERNOR" --root "$FAKE_ROOT" --interval 0 \
+                   --iterations 3 --dwell 2 --dry-run 2>&1)
+    echo "80" > "$FAKE_ROOT/sys/class/power_supply/BAT0/capacity"
+    GOVERNOR_IDLE_LOG=$(python3 "$GOVERNOR" --root "$FAKE_ROOT" --interval 0 \
+                        --iterations 3 --dwell 2 --dry-run 2>&1)
+    rm -rf "$FAKE_ROOT"
+
+    if echo "$GOVERNOR_LOG" | grep -q "\-> power-saver (.*battery=10%)"; then
+        pass "Governor switches to power-saver on low battery"
+    else
+        fail "Governor did not switch to power-saver on low battery"
+    fi
+    if echo "$GOVERNOR_LOG" | grep -q "effects -> reduced"; then
+        pass "Governor reduces compositor effects on low battery"
+    else
+        fail "Governor did not reduce compositor effects"
+    fi
+    if echo "$GOVERNOR_IDLE_LOG" | grep -q "profile .* ->"; then
+        fail "Governor changed the profile without a state change"
+    else
+        pass "Governor keeps the current profile until a state flips"
+    fi
+else
+    warn "omarchy-governor not found"
+fi
+
 # Test 10: Mock TUI run (create fake selections)
 echo "Test 10: Mock installation config"
 